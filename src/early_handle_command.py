@@ -28,33 +28,105 @@ External Service Integration:
 - Discord API for sending responses
 """
 
-import json
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import TTLCache
 import boto3
+from botocore.config import Config
 import logging
+import os
 from datetime import datetime
 
 # Set up logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()  # SAM sets WARNING in production
+logger.setLevel(LOG_LEVEL if isinstance(logging.getLevelName(LOG_LEVEL), int) else logging.INFO)  # Unknown names fall back to INFO
+
+# Shared AWS client settings: keep TCP connections alive between calls
+# and use botocore's standard retry mode
+AWS_CLIENT_CONFIG = Config(tcp_keepalive=True, retries={"max_attempts": 2, "mode": "standard"})
 
 # Initialize AWS clients
-secrets_client = boto3.client("secretsmanager")
+secrets_client = boto3.client("secretsmanager", config=AWS_CLIENT_CONFIG)
 logger.info("Fetching secrets from AWS Secrets Manager")
 secrets = secrets_client.get_secret_value(SecretId="discord_keys")
-secrets_dict = json.loads(secrets["SecretString"])
+secrets_dict = orjson.loads(secrets["SecretString"])
 BOT_TOKEN = secrets_dict["BOT_TOKEN"]
 APPLICATION_ID = secrets_dict["APPLICATION_ID"]
 WEATHER_API_KEY = secrets_dict["WEATHER_API_KEY"]
 
+# Shared HTTP session: pooled keep-alive connections survive across warm
+# invocations, so repeat calls skip the TCP + TLS handshake
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = "DiscordBot (https://github.com/0genblik/discord-bot, 1.0)"  # Format Discord asks for
+# read=0: a GET that timed out is not replayed, so each call stays within its own
+# timeout and the sequential weather GETs finish well inside the function Timeout
+adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, read=0, backoff_factor=0.2, status_forcelist=[502, 503, 504], allowed_methods=frozenset(["GET"]))
+)
+SESSION.mount("https://", adapter)
+SESSION.mount("http://", adapter)
+
+# Followup webhook URL prefix and headers only depend on the secrets, so build them once
+FOLLOWUP_URL_PREFIX = f"https://discord.com/api/v10/webhooks/{APPLICATION_ID}/"
+FOLLOWUP_HEADERS = {
+    "Content-Type": "application/json",
+    "Authorization": f"Bot {BOT_TOKEN}"
+}
+
+# Geocoding results keyed by lowercased location, kept for a day
+GEOCODE_CACHE = TTLCache(maxsize=1024, ttl=86400)
+
+# Formatted weather reports keyed by rounded coordinates. OpenWeather only
+# refreshes current conditions about every 10 minutes, so reuse them that long.
+WEATHER_CACHE = TTLCache(maxsize=512, ttl=600)
+
+def geocode_location(location):
+    """
+    Convert a location name to coordinates using OpenWeather's geocoding API.
+    
+    Why Cache?
+    ---------
+    A city's coordinates don't change, so results are kept in memory for
+    a day, keyed by the normalised location name. Repeat queries in a warm
+    container skip this API call entirely.
+    
+    Returns (lat, lon, name, country), or None if the location is unknown.
+    """
+    cache_key = location.strip().lower()
+    if cache_key in GEOCODE_CACHE:
+        return GEOCODE_CACHE[cache_key]
+    
+    logger.info("Fetching coordinates for location: %s", location)
+    # params= percent-encodes spaces and non-ASCII names ("San Francisco", "Zürich")
+    geo_response = SESSION.get(
+        "https://api.openweathermap.org/geo/1.0/direct",
+        params={"q": location, "limit": 1, "appid": WEATHER_API_KEY},
+        timeout=3
+    )
+    geo_response.raise_for_status()
+    geo_data = orjson.loads(geo_response.content)
+    logger.debug("Geocoding API response: %s", geo_data)
+    
+    if not geo_data:
+        return None
+    
+    coordinates = (geo_data[0]["lat"], geo_data[0]["lon"], geo_data[0]["name"], geo_data[0]["country"])
+    GEOCODE_CACHE[cache_key] = coordinates
+    return coordinates
+
 def get_weather(location):
     """
     Get weather information using OpenWeather API.
     
     Technical Flow:
     -------------
-    1. Geocoding API call to convert location name to coordinates
-    2. Weather API call to get current conditions
+    1. Geocoding API call to convert location name to coordinates (cached)
+    2. Weather API call to get current conditions (cached for 10 minutes)
     3. Format response with emojis and clear structure
     
     Why Two API Calls?
@@ -69,28 +141,30 @@ def get_weather(location):
     - Network timeouts are handled gracefully
     """
     try:
-        # First get coordinates
-        logger.info(f"Fetching coordinates for location: {location}")
-        geo_url = f"http://api.openweathermap.org/geo/1.0/direct?q={location}&limit=1&appid={WEATHER_API_KEY}"
-        geo_response = requests.get(geo_url)
-        geo_response.raise_for_status()
-        geo_data = geo_response.json()
-        logger.info(f"Geocoding API response: {json.dumps(geo_data)}")
+        # First get coordinates (cached per location)
+        coordinates = geocode_location(location)
         
-        if not geo_data:
-            logger.info(f"Location not found: {location}")
+        if not coordinates:
+            logger.info("Location not found: %s", location)
             return f"❌ I couldn't find the location: {location}\nPlease check the spelling and try again!"
             
-        lat = geo_data[0]["lat"]
-        lon = geo_data[0]["lon"]
+        lat, lon, location_name, country = coordinates
+        
+        weather_key = (round(lat, 3), round(lon, 3))
+        if weather_key in WEATHER_CACHE:
+            logger.info("Using cached weather for %s, %s", location_name, country)
+            return WEATHER_CACHE[weather_key]
         
         # Get weather data
-        logger.info(f"Fetching weather data for coordinates: {lat}, {lon}")
-        weather_url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={WEATHER_API_KEY}&units=metric"
-        weather_response = requests.get(weather_url)
+        logger.info("Fetching weather data for coordinates: %s, %s", lat, lon)
+        weather_response = SESSION.get(
+            "https://api.openweathermap.org/data/2.5/weather",
+            params={"lat": lat, "lon": lon, "appid": WEATHER_API_KEY, "units": "metric"},
+            timeout=3
+        )
         weather_response.raise_for_status()
-        weather_data = weather_response.json()
-        logger.info(f"Weather API response: {json.dumps(weather_data)}")
+        weather_data = orjson.loads(weather_response.content)
+        logger.debug("Weather API response: %s", weather_data)
         
         # Format weather information
         temp = round(weather_data["main"]["temp"])
@@ -98,20 +172,20 @@ def get_weather(location):
         description = weather_data["weather"][0]["description"].capitalize()
         humidity = weather_data["main"]["humidity"]
         wind_speed = round(weather_data["wind"]["speed"] * 3.6)  # Convert m/s to km/h
-        location_name = geo_data[0]["name"]
-        country = geo_data[0]["country"]
         
-        logger.info(f"Successfully formatted weather data for {location_name}, {country}")
-        return (
+        logger.info("Successfully formatted weather data for %s, %s", location_name, country)
+        weather_report = (
             f"🌍 Weather in {location_name}, {country}:\n"
             f"🌡️ Temperature: {temp}°C (Feels like {feels_like}°C)\n"
             f"☁️ Conditions: {description}\n"
             f"💧 Humidity: {humidity}%\n"
             f"💨 Wind Speed: {wind_speed} km/h"
         )
+        WEATHER_CACHE[weather_key] = weather_report
+        return weather_report
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching weather: {e}", exc_info=True)
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        logger.error("Error fetching weather: %s", e, exc_info=True)
         return "❌ Sorry, I couldn't fetch the weather information at this time. Please try again later!"
 
 def send_followup_response(interaction_token, response_data):
@@ -130,26 +204,53 @@ def send_followup_response(interaction_token, response_data):
     - Requires bot token for authentication
     - Supports rich message formatting
     """
-    url = f"https://discord.com/api/v10/webhooks/{APPLICATION_ID}/{interaction_token}"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bot {BOT_TOKEN}"
-    }
+    url = FOLLOWUP_URL_PREFIX + interaction_token
     
     try:
-        logger.info(f"Sending followup response to URL: {url}")
-        logger.info(f"Response data: {json.dumps(response_data)}")
-        response = requests.post(url, json=response_data, headers=headers)
+        logger.info("Sending followup response")
+        logger.debug("Response data: %s", response_data)
+        response = SESSION.post(url, data=orjson.dumps(response_data), headers=FOLLOWUP_HEADERS)
         response.raise_for_status()
-        logger.info(f"Response status code: {response.status_code}")
-        logger.info(f"Response body: {response.text}")
+        logger.info("Response status code: %s", response.status_code)
         return True
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error sending followup response: {e}", exc_info=True)
+        logger.error("Error sending followup response: %s", e, exc_info=True)
         if hasattr(e.response, 'text'):
-            logger.error(f"Error response body: {e.response.text}")
+            logger.error("Error response body: %s", e.response.text)
         return False
 
+def get_options(event):
+    """Map the slash command's option names to their values."""
+    return {opt["name"]: opt["value"] for opt in event["data"].get("options") or []}
+
+# /ping always gets the same reply, so build it once
+PONG_MESSAGE = {
+    "content": "Pong!"
+}
+
+def handle_ping(event):
+    """Reply to /ping with the constant health check message."""
+    return PONG_MESSAGE
+
+def handle_weather(event):
+    """Reply to /weather with the current conditions for the given location."""
+    location = get_options(event).get("location")
+    if not location:
+        return {
+            "content": "Please provide a location!"
+        }
+    
+    weather_info = get_weather(location)
+    return {
+        "content": weather_info
+    }
+
+# Slash command name -> handler returning the followup message payload
+COMMAND_HANDLERS = {
+    "ping": handle_ping,
+    "weather": handle_weather,
+}
+
 def lambda_handler(event, _):
     """
     Process Discord commands and send responses.
@@ -169,32 +270,19 @@ def lambda_handler(event, _):
     This Lambda is triggered asynchronously by verify_request.py,
     so we don't have the 3-second Discord timeout to worry about.
     """
-    logger.info(f"Processing deferred command with event: {json.dumps(event)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Processing deferred command with event: %s", orjson.dumps(event).decode())
     
     try:
         # Extract command information
         command = event["data"]["name"]
         interaction_token = event["token"]
-        logger.info(f"Processing command: {command}")
+        logger.info("Processing command: %s", command)
 
-        # Process commands
-        if command == "ping":
-            response_data = {
-                "content": "Pong!"
-            }
-            
-        elif command == "weather":
-            location = next((opt["value"] for opt in event["data"].get("options", []) 
-                           if opt["name"] == "location"), None)
-            if not location:
-                response_data = {
-                    "content": "Please provide a location!"
-                }
-            else:
-                weather_info = get_weather(location)
-                response_data = {
-                    "content": weather_info
-                }
+        # Route the command to its handler
+        handler = COMMAND_HANDLERS.get(command)
+        if handler:
+            response_data = handler(event)
         else:
             response_data = {
                 "content": f"Unknown command: {command}"
@@ -206,18 +294,18 @@ def lambda_handler(event, _):
             logger.error("Failed to send followup response")
             return {
                 "statusCode": 500,
-                "body": json.dumps({"error": "Failed to send response"})
+                "body": orjson.dumps({"error": "Failed to send response"}).decode()
             }
 
         logger.info("Command processed successfully")
         return {
             "statusCode": 200,
-            "body": json.dumps({"message": "Command processed successfully"})
+            "body": orjson.dumps({"message": "Command processed successfully"}).decode()
         }
 
     except Exception as e:
-        logger.error(f"Error processing command: {str(e)}", exc_info=True)
+        logger.error("Error processing command: %s", e, exc_info=True)
         return {
             "statusCode": 500,
-            "body": json.dumps({"error": "Internal server error"})
+            "body": orjson.dumps({"error": "Internal server error"}).decode()
         }
\ No newline at end of file
@@ -38,9 +38,9 @@ AWS_REGION = "eu-west-2"  # London AWS region
 # Create an AWS Secrets Manager client with the specified region 
 secrets_client = boto3.client("secretsmanager", region_name=AWS_REGION)
 secrets = secrets_client.get_secret_value(SecretId="discord_keys")
-BOT_TOKEN = json.loads(secrets["SecretString"])["BOT_TOKEN"]
-APPLICATION_ID = json.loads(secrets["SecretString"])["APPLICATION_ID"]
-print(APPLICATION_ID)
+secrets_dict = json.loads(secrets["SecretString"])
+BOT_TOKEN = secrets_dict["BOT_TOKEN"]
+APPLICATION_ID = secrets_dict["APPLICATION_ID"]
 
 # Define all available commands
 # Each command definition includes:
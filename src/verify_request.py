@@ -28,68 +28,101 @@ Every Discord request includes:
 - Request body
 - Timestamp
 - Ed25519 signature
-We verify these using discord-interactions library to prevent forgery.
+We verify these with PyNaCl (libsodium's Ed25519) to prevent forgery.
 """
 
-import json
+import base64
+from binascii import unhexlify
+import orjson
+import re
 import boto3
 import logging
-import requests
-from discord_interactions import verify_key
+from nacl.signing import VerifyKey
+from nacl.exceptions import BadSignatureError
+from botocore.config import Config
 from botocore.exceptions import ClientError
 import os
 
 # Set up logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()  # SAM sets WARNING in production
+logger.setLevel(LOG_LEVEL if isinstance(logging.getLevelName(LOG_LEVEL), int) else logging.INFO)  # Unknown names fall back to INFO
+
+class PingLogSampler(logging.Filter):
+    """
+    Pass through only one in every `sample_rate` PING log records.
+    
+    Discord's endpoint health checks are the most frequent interaction on
+    a quiet bot; sampling their logs cuts CloudWatch volume without
+    hiding commands, buttons or errors.
+    """
+    def __init__(self, sample_rate=100):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.ping_count = 0
+    
+    def filter(self, record):
+        if "PING" not in str(record.msg):
+            return True
+        self.ping_count += 1
+        return (self.ping_count - 1) % self.sample_rate == 0
+
+logger.addFilter(PingLogSampler())
+
+# Shared AWS client settings: keep TCP connections alive between calls
+# and use botocore's standard retry mode
+AWS_CLIENT_CONFIG = Config(tcp_keepalive=True, retries={"max_attempts": 2, "mode": "standard"})
 
 # Initialize AWS clients
-secrets_client = boto3.client("secretsmanager")
-lambda_client = boto3.client("lambda")
-logger.info("AWS clients initialized")
+lambda_client = None  # Created on first command by get_lambda_client()
+
+# Discord's public key isn't secret, so SAM can pass it in DISCORD_PUBLIC_KEY
+# and cold starts skip Secrets Manager entirely. Without it, read it once from
+# discord_keys at import; warm invocations reuse the decoded key.
+DISCORD_PUBLIC_KEY = os.environ.get("DISCORD_PUBLIC_KEY")
+if not DISCORD_PUBLIC_KEY:
+    secrets_client = boto3.client("secretsmanager", config=AWS_CLIENT_CONFIG)
+    secrets = secrets_client.get_secret_value(SecretId="discord_keys")
+    secrets_dict = orjson.loads(secrets["SecretString"])
+    DISCORD_PUBLIC_KEY = secrets_dict["DISCORD_PUBLIC_KEY"]
+    logger.info("Read Discord public key from Secrets Manager")
 
-# Get secrets once at module level
-secrets = secrets_client.get_secret_value(SecretId="discord_keys")
-secrets_dict = json.loads(secrets["SecretString"])
-BOT_TOKEN = secrets_dict["BOT_TOKEN"]
-APPLICATION_ID = secrets_dict["APPLICATION_ID"]
+# Decode Discord's public key once; every request then only pays for the verify itself
+DISCORD_VERIFY_KEY = VerifyKey(bytes.fromhex(DISCORD_PUBLIC_KEY))
 
-def send_interaction_response(interaction_id, interaction_token, response_data):
+# Name of the handle_command Lambda. SAM injects the exact name; if it is
+# missing we resolve it once by prefix and cache it for warm invocations.
+STACK_NAME = os.environ.get("AWS_SAM_STACK_NAME", "discord-bot")
+HANDLE_COMMAND_FUNCTION_NAME = os.environ.get("HANDLE_COMMAND_FUNCTION_NAME")
+
+# Constant API Gateway responses, serialized once at import time
+PONG_RESPONSE = {"statusCode": 200, "body": orjson.dumps({"type": 1}).decode()}
+DEFERRED_RESPONSE = {"statusCode": 200, "body": orjson.dumps({"type": 5}).decode()}  # DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE
+UNAUTHORIZED_RESPONSE = {"statusCode": 401, "body": orjson.dumps({"error": "Invalid request signature"}).decode()}
+COMMAND_FAILED_RESPONSE = {"statusCode": 500, "body": orjson.dumps({"error": "Failed to process command"}).decode()}
+INTERNAL_ERROR_RESPONSE = {"statusCode": 500, "body": orjson.dumps({"error": "Internal server error"}).decode()}
+BAD_REQUEST_RESPONSE = {"statusCode": 400, "body": orjson.dumps({"error": "Invalid request body"}).decode()}
+
+# Interaction payloads are a few KB; reject anything larger before verifying
+MAX_BODY_BYTES = 64 * 1024
+
+# Numbered answer lines ("1. Paris") in a trivia question message
+TRIVIA_ANSWER_PATTERN = re.compile(r"^\s*\d+\.\s*(.*?)\s*$", re.MULTILINE)
+
+def get_request_body(event):
     """
-    Send an immediate response to a Discord interaction.
+    Return the raw request body as bytes, exactly as Discord sent it.
     
-    Discord expects responses within 3 seconds. This function handles the immediate
-    response requirement, while longer operations are deferred to handle_command Lambda.
-    
-    Parameters:
-    -----------
-    interaction_id : str
-        The unique ID of the Discord interaction
-    interaction_token : str
-        Discord's temporary token for responding to this interaction
-    response_data : dict
-        The response payload to send back to Discord
-        
-    Architecture Note:
-    -----------------
-    This is one of two ways we respond to Discord:
-    1. Immediate responses (this function)
-    2. Followup messages (used in handle_command.py)
+    API Gateway passes the body as a string, or base64-encoded when
+    isBase64Encoded is set. Decoding it once here gives both signature
+    verification and JSON parsing the same bytes object.
     """
-    url = f"https://discord.com/api/v10/interactions/{interaction_id}/{interaction_token}/callback"
-    headers = {
-        "Content-Type": "application/json"
-    }
-    
-    try:
-        response = requests.post(url, headers=headers, json=response_data)
-        response.raise_for_status()
-        return True
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error sending interaction response: {e}")
-        return False
+    raw_body = event.get("body") or ""
+    if event.get("isBase64Encoded"):
+        return base64.b64decode(raw_body)
+    return raw_body.encode()
 
-def verify_signature(event):
+def verify_signature(body, headers):
     """
     Verifies the cryptographic signature of Discord requests.
     
@@ -106,13 +139,15 @@ def verify_signature(event):
        - Request isn't too old (replay attack protection)
        
     This is a critical security feature required by Discord.
+    
+    Parameters:
+    -----------
+    body : bytes
+        The raw request body from get_request_body
+    headers : dict
+        The incoming HTTP headers from the API Gateway event, with lowercased names
     """
     try:
-        discord_public_key = secrets_dict["DISCORD_PUBLIC_KEY"]
-        
-        headers = event.get("headers", {})
-        raw_body = event.get("body", "")
-        
         signature = headers.get("x-signature-ed25519")
         timestamp = headers.get("x-signature-timestamp")
         
@@ -120,21 +155,83 @@ def verify_signature(event):
             logger.error("Missing signature or timestamp headers")
             return False
             
-        is_verified = verify_key(raw_body.encode(), signature, timestamp, discord_public_key)
-        logger.info(f"Event verification status: {is_verified}")
+        try:
+            DISCORD_VERIFY_KEY.verify(timestamp.encode() + body, unhexlify(signature))
+            is_verified = True
+        except BadSignatureError:
+            is_verified = False
+        if not is_verified:
+            logger.warning("Invalid request signature")
         return is_verified
     except Exception as e:
-        logger.error(f"Error verifying signature: {e}", exc_info=True)
+        logger.error("Error verifying signature: %s", e, exc_info=True)
         return False
 
-def trigger_command_handler(event_body):
+def get_lambda_client():
+    """
+    Return the Lambda client, creating it on first use.
+    
+    Only commands need to invoke handle_command, so building the client
+    lazily keeps its setup cost off cold starts that only answer PINGs.
+    A single attempt with 1-second timeouts keeps a slow AWS call inside
+    Discord's 3-second window, and never queues an Event invoke twice.
+    """
+    global lambda_client
+    if lambda_client is None:
+        lambda_client = boto3.client("lambda", config=AWS_CLIENT_CONFIG.merge(Config(
+            connect_timeout=1,
+            read_timeout=1,
+            retries={"max_attempts": 1, "mode": "standard"}
+        )))
+    return lambda_client
+
+# Provisioned instances run init before any traffic arrives, so build the
+# client there and keep botocore's model loading off the first command
+if os.environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency":
+    get_lambda_client()
+    # A DryRun invoke only checks permissions, but it also opens the pooled
+    # TLS connection to the Lambda API so the first real invoke skips the handshake
+    if HANDLE_COMMAND_FUNCTION_NAME:
+        try:
+            lambda_client.invoke(FunctionName=HANDLE_COMMAND_FUNCTION_NAME, InvocationType="DryRun")
+        except Exception as e:
+            logger.warning("Could not prewarm Lambda API connection: %s", e)
+
+def resolve_command_handler_name():
+    """
+    Resolve the name of the handle_command Lambda function.
+    
+    Why Cache?
+    ---------
+    Listing every Lambda in the account is a slow AWS API round-trip.
+    The SAM template passes the exact name in HANDLE_COMMAND_FUNCTION_NAME,
+    so normally this is just a variable read. Without it we page through
+    list_functions once per container and remember the match.
+    """
+    global HANDLE_COMMAND_FUNCTION_NAME
+    if HANDLE_COMMAND_FUNCTION_NAME:
+        return HANDLE_COMMAND_FUNCTION_NAME
+    
+    function_prefix = f"{STACK_NAME}-HandleCommandFunction-"  # AWS SAM will append a unique suffix
+    logger.warning("HANDLE_COMMAND_FUNCTION_NAME not set; listing Lambda functions to find command handler")
+    paginator = get_lambda_client().get_paginator("list_functions")
+    for page in paginator.paginate():
+        for function in page["Functions"]:
+            if function["FunctionName"].startswith(function_prefix):
+                HANDLE_COMMAND_FUNCTION_NAME = function["FunctionName"]
+                return HANDLE_COMMAND_FUNCTION_NAME
+    
+    raise Exception(f"Could not find function starting with {function_prefix}")
+
+def trigger_command_handler(payload):
     """
     Triggers the command handler Lambda function asynchronously.
     
     Architecture Note:
     ----------------
     This is where the two Lambda functions connect. We:
-    1. Find the handle_command Lambda by name pattern
+    1. Get the handle_command Lambda's name from HANDLE_COMMAND_FUNCTION_NAME
+       via resolve_command_handler_name (name-prefix lookup only as a fallback)
     2. Invoke it asynchronously (InvocationType="Event")
     3. Don't wait for its response
     
@@ -146,38 +243,30 @@ def trigger_command_handler(event_body):
     
     AWS Integration:
     --------------
-    - Uses Lambda list_functions to find the handler dynamically
+    - Function name comes from resolve_command_handler_name (cached)
     - AWS SAM automatically adds required IAM permissions
     - Function names are based on CloudFormation stack name
+    
+    Parameters:
+    -----------
+    payload : bytes
+        The verified interaction body, forwarded as-is so it isn't
+        re-serialized (handle_command receives the same JSON)
     """
     try:
-        # Get stack name from environment variable or use default
-        stack_name = os.environ.get("AWS_SAM_STACK_NAME", "discord-bot")
-        function_name = f"{stack_name}-HandleCommandFunction-"  # AWS SAM will append a unique suffix
-        
-        logger.info("Listing Lambda functions to find command handler")
-        functions = lambda_client.list_functions()
-        handle_command_function = next(
-            (f["FunctionName"] for f in functions["Functions"] 
-             if f["FunctionName"].startswith(function_name)),
-            None
-        )
-        
-        if not handle_command_function:
-            raise Exception(f"Could not find function starting with {function_name}")
-            
-        logger.info(f"Invoking function: {handle_command_function}")
-        response = lambda_client.invoke(
+        handle_command_function = resolve_command_handler_name()
+        logger.debug("Invoking function: %s", handle_command_function)
+        response = get_lambda_client().invoke(
             FunctionName=handle_command_function,
             InvocationType="Event",
-            Payload=json.dumps(event_body)
+            Payload=payload
         )
         
         # Only log response metadata, not the full response object
-        logger.info(f"Lambda invoke response status code: {response['ResponseMetadata']['HTTPStatusCode']}")
+        logger.debug("Lambda invoke response status code: %s", response["ResponseMetadata"]["HTTPStatusCode"])
         return True
     except Exception as e:
-        logger.error(f"Error triggering command handler: {str(e)}", exc_info=True)
+        logger.error("Error triggering command handler: %s", e, exc_info=True)
         return False
 
 def handle_button_interaction(event_body):
@@ -201,7 +290,7 @@ def handle_button_interaction(event_body):
     This embeds both the user's choice and correct answer for verification.
     """
     try:
-        logger.info("Processing button interaction")
+        logger.debug("Processing button interaction")
         # Extract the custom_id from the button that was clicked
         custom_id = event_body["data"]["custom_id"]
         
@@ -214,23 +303,15 @@ def handle_button_interaction(event_body):
             # Get message that contains the question
             message = event_body.get("message", {})
             content = message.get("content", "")
-            logger.info(f"Processing answer for question: {content}")
+            logger.debug("Processing answer for question: %s", content)
             
-            # Find all answers from the message content
-            lines = content.split("\n")
-            answers = []
-            for line in lines:
-                # Look for lines starting with numbers (1. 2. etc)
-                if line.strip() and line.strip()[0].isdigit():
-                    # Split after the number and period to get just the answer text
-                    answer = line.split(".", 1)[1].strip()
-                    answers.append(answer)
+            # Find all answers from the message content in one regex pass
+            answers = TRIVIA_ANSWER_PATTERN.findall(content)
             
-            logger.info(f"Found answers: {answers}")
-            logger.info(f"Selected num: {selected_num}, Correct index: {correct_index}")
+            logger.debug("Found answers: %s", answers)
+            logger.debug("Selected num: %s, Correct index: %s", selected_num, correct_index)
             
             if selected_num < len(answers):  # Changed <= to < since we're using 0-based index
-                selected_answer = answers[selected_num]  # Use selected_num directly since it's already 0-based
                 correct_answer = answers[correct_index]
                 is_correct = selected_num == correct_index
                 
@@ -239,7 +320,7 @@ def handle_button_interaction(event_body):
                 else:
                     response_message = f"❌ Sorry, that's incorrect. The correct answer was: {correct_answer}"
                 
-                logger.info(f"Sending response: {response_message}")
+                logger.debug("Sending response: %s", response_message)
                 response_data = {
                     "type": 4,  # MESSAGE_WITH_SOURCE
                     "data": {
@@ -249,7 +330,7 @@ def handle_button_interaction(event_body):
                 }
                 return response_data
     except Exception as e:
-        logger.error(f"Error handling button interaction: {e}", exc_info=True)
+        logger.error("Error handling button interaction: %s", e, exc_info=True)
     
     return {
         "type": 4,
@@ -287,64 +368,53 @@ def lambda_handler(event, context):
     BUTTON -> Process directly here
     """
     try:
-        logger.info(f"Received event: {json.dumps(event)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received event: %s", orjson.dumps(event).decode())
+        
+        # Read headers and body once; both verification and parsing use them
+        headers = {name.lower(): value for name, value in (event.get("headers") or {}).items()}  # REST APIs keep header case
+        body = get_request_body(event)
+        if not body or len(body) > MAX_BODY_BYTES:
+            logger.warning("Rejecting request body of %s bytes", len(body))
+            return BAD_REQUEST_RESPONSE
         
         # Verify the request
-        if not verify_signature(event):
-            return {
-                "statusCode": 401,
-                "body": json.dumps({"error": "Invalid request signature"})
-            }
+        if not verify_signature(body, headers):
+            return UNAUTHORIZED_RESPONSE
 
         # Parse the request body
-        event_body = json.loads(event.get("body", "{}"))
+        event_body = orjson.loads(body)
         interaction_type = event_body.get("type")
-        logger.info(f"Processing interaction type: {interaction_type}")
+        logger.debug("Processing interaction type: %s", interaction_type)
         
         if interaction_type == 1:  # PING
             logger.info("Handling PING interaction")
-            return {
-                "statusCode": 200,
-                "body": json.dumps({"type": 1})
-            }
+            return PONG_RESPONSE
         elif interaction_type == 2:  # APPLICATION_COMMAND
-            logger.info(f"Handling command: {event_body.get('data', {}).get('name')}")
-            # For commands, acknowledge receipt and defer to command handler
-            response_data = {
-                "type": 5,  # DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE
-            }
-            
+            logger.info("Handling command: %s", event_body.get("data", {}).get("name"))
             # Trigger command handler asynchronously
-            if not trigger_command_handler(event_body):
+            if not trigger_command_handler(body):
                 logger.error("Failed to trigger command handler")
-                return {
-                    "statusCode": 500,
-                    "body": json.dumps({"error": "Failed to process command"})
-                }
+                return COMMAND_FAILED_RESPONSE
             
-            logger.info("Successfully deferred command and triggered handler")
-            return {
-                "statusCode": 200,
-                "body": json.dumps(response_data)
-            }
+            # For commands, acknowledge receipt and defer to command handler
+            logger.debug("Successfully deferred command and triggered handler")
+            return DEFERRED_RESPONSE
         elif interaction_type == 3:  # MESSAGE_COMPONENT (Button clicks)
             logger.info("Handling button interaction")
             response_data = handle_button_interaction(event_body)
             
             return {
                 "statusCode": 200,
-                "body": json.dumps(response_data)
+                "body": orjson.dumps(response_data).decode()
             }
         else:
-            logger.warning(f"Unknown interaction type: {interaction_type}")
+            logger.warning("Unknown interaction type: %s", interaction_type)
             return {
                 "statusCode": 400,
-                "body": json.dumps({"error": f"Unknown interaction type: {interaction_type}"})
+                "body": orjson.dumps({"error": f"Unknown interaction type: {interaction_type}"}).decode()
             }
 
     except Exception as e:
-        logger.error(f"Error in handler: {e}", exc_info=True)
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": "Internal server error"})
-        }
\ No newline at end of file
+        logger.error("Error in handler: %s", e, exc_info=True)
+        return INTERNAL_ERROR_RESPONSE
\ No newline at end of file